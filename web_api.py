@@ -1,63 +1,267 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file
+from werkzeug.wsgi import ClosingIterator
 from flask_cors import CORS
 import os
+import orjson
 import requests
+import httpx
 from dotenv import load_dotenv
 import logging
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
 import re
+import codecs
 import time
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 import signal
+import threading
+from contextlib import ExitStack, contextmanager
+from urllib.parse import urlsplit
+from cachetools import TTLCache
 import ssl
 
+# Gunakan selectolax (Lexbor) bila tersedia, fallback ke lxml
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# Tag yang dibuang dan tag yang diambil teksnya, beserta selector turunannya
+_DROP = ("script", "style", "nav", "footer", "header")
+_KEEP = ("p", "h1", "h2", "h3", "h4", "h5", "h6", "li")
+_DROP_CSS = ",".join(_DROP)
+_KEEP_CSS = ",".join(_KEEP)
+
+# Ambil semua node teks dari tag konten dalam satu kali penelusuran tree
+_TEXT_XPATH = etree.XPath(" | ".join(f"//{tag}//text()" for tag in _KEEP), smart_strings=False)
+
+# Parsing HTML dijalankan di thread OS asli agar tidak memblokir worker.
+# Di bawah gevent, threading sudah di-patch menjadi greenlet, jadi pakai threadpool milik gevent.
+try:
+    from gevent import monkey
+    GEVENT_PATCHED = monkey.is_module_patched("threading")
+except ImportError:
+    GEVENT_PATCHED = False
+
+if GEVENT_PATCHED:
+    from gevent.threadpool import ThreadPoolExecutor
+else:
+    from concurrent.futures import ThreadPoolExecutor
+
+EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
+# Batas URL per permintaan /summarize_batch dan jumlah URL yang diproses paralel
+MAX_BATCH_URLS = 10
+BATCH_CONCURRENCY = 8
+
+# Batas ukuran halaman yang diunduh dan ukuran chunk saat streaming
+MAX_BYTES = 2_000_000
+CHUNK_SIZE = 64 * 1024
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Load konfigurasi dari .env
+load_dotenv()
+
+# Konfigurasi yang dapat diubah lewat environment variable
+ALLOWED_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv(
+        "ALLOWED_ORIGINS", "https://lintasai.com,https://web-production-a20a.up.railway.app"
+    ).split(",")
+    if origin.strip()
+]
+MODEL = os.getenv("OPENROUTER_MODEL", "deepseek/deepseek-r1:free")
+# Batas jumlah kata yang dikirim ke model
+WORD_LIMIT = int(os.getenv("WORD_LIMIT", "300"))
+
 # Inisialisasi Flask
 app = Flask(__name__)
 
 # Konfigurasi CORS
 CORS(app, resources={r"/*": {
-    "origins": ["https://lintasai.com", "https://web-production-a20a.up.railway.app"],
+    "origins": ALLOWED_ORIGINS,
     "methods": ["GET", "POST", "OPTIONS"],
     "allow_headers": ["Content-Type", "Authorization"]
 }})
-logger.info("CORS configured for origins: https://lintasai.com, https://web-production-a20a.up.railway.app")
+logger.info(f"CORS configured for origins: {', '.join(ALLOWED_ORIGINS)}")
 
-# Load API Key dari .env
-load_dotenv()
+# Load API Key
 api_key = os.getenv("OPENROUTER_API_KEY")
 logger.info(f"API Key loaded: {'[REDACTED]' if api_key else 'None'}")
 
+# Bagian konstan dari permintaan, dibangun sekali saat import
+FETCH_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+OPENROUTER_HEADERS = {
+    "Authorization": f"Bearer {api_key}",
+    "Content-Type": "application/json",
+    "HTTP-Referer": "https://lintasai.com/web-summarizer-ai/",
+    "X-Title": "Web Summarizer"
+}
+SYSTEM_MESSAGE = {"role": "system", "content": "You are a helpful assistant that summarizes website content."}
+PROMPT_PREFIX = (
+    "Tolong buatkan ringkasan dalam bentuk poin-poin dan paragraf kesimpulan dari isi website berikut dalam bahasa Indonesia.\n"
+    "Hanya berikan ringkasan dalam format poin-poin dan paragraf kesimpulan, tanpa penjelasan proses pemikiran, langkah-langkah, atau informasi tambahan lainnya:\n\n"
+)
+
+# Client HTTP/2 untuk OpenRouter: banyak permintaan dimultipleks dalam satu koneksi keep-alive
+CLIENT = httpx.Client(
+    headers=OPENROUTER_HEADERS,
+    timeout=60,
+    transport=httpx.HTTPTransport(
+        http2=True,
+        retries=3,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+    )
+)
+
+# Transport httpx hanya mengulang koneksi yang gagal; status berikut diulang secara manual
+OPENROUTER_RETRIES = 3
+OPENROUTER_BACKOFF_FACTOR = 1
+OPENROUTER_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Session global dengan connection pooling dan retry, dipakai ulang antar request
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+))
+
+# Pola regex dikompilasi sekali saat import
+_URL_RE = re.compile(r'^(https?:\/\/)?([\w\-]+(\.[\w\-]+)+[\/]?.*)$')
+
 # Fungsi validasi URL
 def is_valid_url(url):
-    pattern = r'^(https?:\/\/)?([\w\-]+(\.[\w\-]+)+[\/]?.*)$'
-    return re.match(pattern, url) is not None
+    return _URL_RE.match(url) is not None and normalize_url(url) is not None
+
+# Abaikan charset yang tidak dikenal Python, seperti fallback replace-decode pada response.text
+def _known_encoding(encoding):
+    if encoding:
+        try:
+            return codecs.lookup(encoding).name
+        except LookupError:
+            logger.warning(f"Encoding tidak dikenal: {encoding}, memakai utf-8")
+    return "utf-8"
+
+# Fungsi parsing HTML menjadi teks, dijalankan di EXECUTOR
+def _parse(html_bytes, encoding, max_words=None):
+    encoding = _known_encoding(encoding)
+    if LexborHTMLParser is not None:
+        tree = LexborHTMLParser(html_bytes.decode(encoding, errors="replace"))
+        for node in tree.css(_DROP_CSS):
+            node.decompose()
+        texts = (node.text(strip=True) for node in tree.css(_KEEP_CSS))
+    else:
+        root = lxml.html.document_fromstring(html_bytes, parser=lxml.html.HTMLParser(encoding=encoding))
+        etree.strip_elements(root, *_DROP, with_tail=False)
+        texts = _TEXT_XPATH(root)
+
+    # Pecah teks menjadi kata sekali saja dan berhenti begitu batas kata tercapai.
+    # str.split() tanpa argumen sudah meringkas semua whitespace dan membuang spasi di tepi.
+    words = []
+    for text in texts:
+        words.extend(text.split())
+        if max_words is not None and len(words) >= max_words:
+            if len(words) > max_words:
+                logger.warning(f"Teks dipotong menjadi {max_words} kata untuk optimasi")
+            del words[max_words:]
+            break
+    return " ".join(words)
+
+# Cache hasil ekstraksi dan ringkasan per URL (TTLCache tidak thread-safe, jadi dijaga lock).
+# maxsize menghitung jumlah entri, jadi EXTRACT_CACHE hanya menyimpan teks yang sudah dipotong.
+EXTRACT_CACHE = TTLCache(maxsize=1024, ttl=3600)
+SUMMARY_CACHE = TTLCache(maxsize=1024, ttl=3600)
+_CACHE_LOCK = threading.Lock()
+
+# Lock per URL untuk mencegah pemrosesan ganda secara bersamaan (thundering herd).
+# Penunggu menyerah setelah URL_LOCK_TIMEOUT detik dan memproses tanpa menunggu cache.
+_INFLIGHT = {}
+_INFLIGHT_LOCK = threading.Lock()
+URL_LOCK_TIMEOUT = 30
+
+# Normalisasi URL untuk kunci cache: skema dan host huruf kecil, tanpa fragment.
+# Mengembalikan None bila URL tidak dapat diurai (misalnya host IPv6 yang rusak).
+def normalize_url(url):
+    if "://" not in url:
+        url = f"http://{url}"
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return None
+    key = f"{parts.scheme.lower()}://{parts.netloc.lower()}{parts.path or '/'}"
+    if parts.query:
+        key += f"?{parts.query}"
+    return key
+
+def _cache_get(cache, key):
+    with _CACHE_LOCK:
+        return cache.get(key)
+
+def _cache_set(cache, key, value):
+    with _CACHE_LOCK:
+        cache[key] = value
+
+@contextmanager
+def _url_lock(key):
+    with _INFLIGHT_LOCK:
+        entry = _INFLIGHT.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    acquired = False
+    try:
+        acquired = entry[0].acquire(timeout=URL_LOCK_TIMEOUT)
+        yield acquired
+    finally:
+        if acquired:
+            entry[0].release()
+        with _INFLIGHT_LOCK:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _INFLIGHT[key]
 
 # Fungsi ekstrak teks dari website
-def extract_text_from_url(url):
+def extract_text_from_url(url, max_words=None):
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
+        cache_key = (normalize_url(url), max_words)
+        content = _cache_get(EXTRACT_CACHE, cache_key)
+        if content is not None:
+            return content
+
+        with SESSION.get(url, headers=FETCH_HEADERS, timeout=10, stream=True) as response:
+            response.raise_for_status()
 
-        soup = BeautifulSoup(response.text, "html.parser")
-        for element in soup(["script", "style", "nav", "footer", "header"]):
-            element.decompose()
+            # Jangan unduh atau parsing konten yang bukan HTML/XML (PDF, gambar, dll.)
+            content_type = response.headers.get("Content-Type", "").lower()
+            if "html" not in content_type and "xml" not in content_type:
+                logger.warning(f"Content-Type tidak didukung: {content_type or 'tidak ada'}")
+                return None
 
-        text_elements = soup.find_all(["p", "h1", "h2", "h3", "h4", "h5", "h6", "li"])
-        content = " ".join([elem.get_text(strip=True) for elem in text_elements])
-        content = re.sub(r'\s+', ' ', content).strip()
+            # Baca body per chunk dan berhenti setelah MAX_BYTES
+            html_bytes = bytearray()
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                html_bytes += chunk
+                if len(html_bytes) > MAX_BYTES:
+                    logger.warning(f"Halaman melebihi {MAX_BYTES} byte, dipotong")
+                    del html_bytes[MAX_BYTES:]
+                    break
+            encoding = response.encoding
+
+        content = EXECUTOR.submit(_parse, bytes(html_bytes), encoding, max_words).result()
 
         if not content:
             logger.warning("Tidak ada teks yang dapat diekstrak dari URL")
             return None
 
+        # Hanya cache teks yang sudah dibatasi max_words agar ukuran cache tetap kecil
+        if max_words is not None and cache_key[0] is not None:
+            _cache_set(EXTRACT_CACHE, cache_key, content)
         return content
     except Exception as e:
         logger.error(f"Gagal mengekstrak teks dari URL: {str(e)}")
@@ -68,8 +272,6 @@ def handle_abort_signal(signum, frame):
     logger.error(f"Received signal {signum}, aborting worker")
     raise SystemExit(f"Worker aborted with signal {signum}")
 
-signal.signal(signal.SIGABRT, handle_abort_signal)
-
 # Route untuk menyajikan halaman utama
 @app.route('/')
 def home():
@@ -78,10 +280,180 @@ def home():
 
 # Route untuk menangani preflight OPTIONS
 @app.route('/summarize', methods=['OPTIONS'])
+@app.route('/summarize_batch', methods=['OPTIONS'])
 def handle_options():
-    logger.info("Handling OPTIONS request for /summarize")
+    logger.info(f"Handling OPTIONS request for {request.path}")
     return jsonify({"status": "ok"}), 200
 
+# Kirim permintaan ke OpenRouter, ulangi dengan backoff bila statusnya sementara (429/5xx)
+def _send_openrouter(body, stream=False):
+    for attempt in range(OPENROUTER_RETRIES + 1):
+        response = CLIENT.send(CLIENT.build_request("POST", OPENROUTER_URL, content=body), stream=stream)
+        if response.status_code not in OPENROUTER_RETRY_STATUSES or attempt == OPENROUTER_RETRIES:
+            return response
+        # Tutup respons yang gagal agar koneksinya kembali ke pool sebelum mencoba lagi
+        response.close()
+        delay = OPENROUTER_BACKOFF_FACTOR * (2 ** attempt)
+        logger.warning(
+            f"OpenRouter mengembalikan status {response.status_code}, "
+            f"mencoba lagi dalam {delay} detik ({attempt + 1}/{OPENROUTER_RETRIES})"
+        )
+        time.sleep(delay)
+
+# Format satu event Server-Sent Events
+def _sse_event(data):
+    return b"data: " + orjson.dumps(data) + b"\n\n"
+
+# Teruskan token dari stream OpenRouter ke klien sebagai SSE, lalu simpan ringkasan lengkap ke cache.
+# release() melepas lock URL begitu stream dari OpenRouter selesai, tanpa menunggu klien menutup koneksi.
+def _stream_summary(response, cache_key, release):
+    parts = []
+    done = False
+    try:
+        for line in response.iter_lines():
+            # Lewati baris kosong dan komentar keep-alive dari OpenRouter
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                done = True
+                break
+            chunk = orjson.loads(data)
+            if "error" in chunk:
+                logger.error(f"Error dari stream OpenRouter: {chunk['error']}")
+                release()
+                yield _sse_event({"error": "Gagal meringkas website"})
+                return
+            delta = chunk["choices"][0].get("delta", {}).get("content") if chunk.get("choices") else None
+            if delta:
+                parts.append(delta)
+                yield _sse_event({"delta": delta})
+        # Stream yang terputus sebelum [DONE] hanya berisi ringkasan parsial, jadi jangan di-cache
+        if not done:
+            logger.error("Stream OpenRouter berakhir sebelum [DONE]")
+            release()
+            yield _sse_event({"error": "Respons dari layanan AI terputus"})
+            return
+        summary = "".join(parts)
+        if summary:
+            _cache_set(SUMMARY_CACHE, cache_key, summary)
+        release()
+        yield b"data: [DONE]\n\n"
+    except Exception as e:
+        logger.error(f"Gagal membaca stream dari OpenRouter: {str(e)}")
+        release()
+        yield _sse_event({"error": f"Gagal membaca respons dari OpenRouter: {str(e)}"})
+    finally:
+        response.close()
+        release()
+
+# Ekstrak, ringkas, dan simpan hasil ringkasan sebuah URL ke cache.
+# Mengembalikan (data, status): dict untuk dijadikan JSON, atau iterable SSE bila stream berhasil.
+def _summarize_url(web_url, cache_key, lock_stack, stream=False):
+    content = extract_text_from_url(web_url, max_words=WORD_LIMIT)
+    if not content:
+        logger.error("Tidak ada teks yang dapat diekstrak dari website ini")
+        return {"error": "Tidak ada teks yang dapat diekstrak dari website ini"}, 400
+
+    # Teks sudah dinormalisasi dan dibatasi WORD_LIMIT kata oleh _parse
+    logger.info(f"Jumlah kata teks: {content.count(' ') + 1}")
+
+    if not api_key:
+        logger.error("API Key OpenRouter tidak ditemukan di environment!")
+        return {"error": "API Key tidak tersedia"}, 500
+
+    payload = {
+        "model": MODEL,
+        "messages": [SYSTEM_MESSAGE, {"role": "user", "content": PROMPT_PREFIX + content}]
+    }
+    if stream:
+        payload["stream"] = True
+
+    # Tambahkan timeout dan logging waktu
+    start_time = time.time()
+    try:
+        response = _send_openrouter(orjson.dumps(payload), stream=stream)
+        elapsed_time = time.time() - start_time
+        logger.info(f"OpenRouter respons dalam {elapsed_time:.2f} detik, status: {response.status_code}")
+    except httpx.TimeoutException:
+        logger.error("Permintaan ke OpenRouter timeout setelah 60 detik")
+        return {"error": "Permintaan ke layanan AI timeout. Coba lagi nanti."}, 504
+    except httpx.ConnectError as e:
+        logger.error(f"Koneksi ke OpenRouter gagal: {str(e)}")
+        return {"error": "Gagal menghubungi layanan AI karena masalah koneksi."}, 503
+    except httpx.HTTPError as e:
+        logger.error(f"Gagal menghubungi OpenRouter: {str(e)}")
+        return {"error": f"Gagal menghubungi layanan AI: {str(e)}"}, 503
+
+    if response.status_code != 200:
+        # Pada mode stream body belum dibaca, jadi baca dulu sebelum menutup koneksi
+        response.read()
+        response.close()
+        logger.error(f"Error dari OpenRouter: {response.status_code} - {response.text}")
+        return {"error": "Gagal meringkas website", "details": response.text}, 500
+
+    if stream:
+        # Lock URL diserahkan ke stream dan dilepas saat stream dari OpenRouter selesai.
+        # ClosingIterator memastikan koneksi dan lock tetap dilepas bila klien pergi sebelum stream dibaca.
+        release = lock_stack.pop_all().close
+        return ClosingIterator(_stream_summary(response, cache_key, release), [response.close, release]), 200
+
+    try:
+        result = orjson.loads(response.content)
+        logger.info(f"Raw OpenRouter JSON response: {result}")
+        # Coba format standar OpenAI
+        if "choices" in result and result["choices"]:
+            summary = result["choices"][0]["message"]["content"]
+        # Coba format alternatif
+        elif "content" in result:
+            summary = result["content"]
+        # Coba format lain
+        elif "message" in result and "content" in result["message"]:
+            summary = result["message"]["content"]
+        else:
+            raise KeyError("No valid content found in JSON response")
+        logger.info(f"Extracted summary: {summary[:200]}...")
+        _cache_set(SUMMARY_CACHE, cache_key, summary)
+        return {"summary": summary}, 200
+    except Exception as e:
+        logger.error(f"Gagal parsing JSON dari OpenRouter: {str(e)}")
+        return {"error": f"Gagal membaca respons dari OpenRouter: {str(e)}"}, 500
+
+# Ambil ringkasan dari cache atau buat baru, dengan lock per URL
+def _summarize_cached(web_url, stream=False):
+    # Gabungkan permintaan untuk URL yang sama agar tidak memproses ulang secara bersamaan
+    cache_key = normalize_url(web_url)
+    with ExitStack() as stack:
+        if not stack.enter_context(_url_lock(cache_key)):
+            logger.warning(f"Menunggu lock untuk {cache_key} melebihi {URL_LOCK_TIMEOUT} detik, diproses tanpa menunggu")
+        summary = _cache_get(SUMMARY_CACHE, cache_key)
+        if summary is not None:
+            logger.info(f"Ringkasan diambil dari cache untuk {cache_key}")
+            if stream:
+                return [_sse_event({"delta": summary}), b"data: [DONE]\n\n"], 200
+            return {"summary": summary}, 200
+        return _summarize_url(web_url, cache_key, stack, stream=stream)
+
+# Ringkas satu URL untuk batch, dijalankan di pool milik permintaan batch
+def _summarize_batch_item(web_url):
+    if not is_valid_url(web_url):
+        return {"error": "URL website tidak valid"}
+    try:
+        result, _ = _summarize_cached(web_url)
+        return result
+    except Exception as e:
+        logger.error(f"Gagal meringkas {web_url}: {str(e)}")
+        return {"error": f"Terjadi error internal: {str(e)}"}
+
+# Jalankan semua item batch secara paralel dengan pool khusus untuk permintaan ini,
+# sehingga satu batch yang lambat tidak menahan batch dari klien lain
+def _run_batch(web_urls):
+    if GEVENT_PATCHED:
+        from gevent.pool import Pool
+        return Pool(BATCH_CONCURRENCY).map(_summarize_batch_item, web_urls)
+    with ThreadPoolExecutor(max_workers=BATCH_CONCURRENCY) as executor:
+        return list(executor.map(_summarize_batch_item, web_urls))
+
 # Route untuk ringkasan
 @app.post('/summarize')
 def summarize():
@@ -101,100 +473,55 @@ def summarize():
             logger.error("URL website tidak valid")
             return jsonify({"error": "URL website tidak valid"}), 400
 
-        content = extract_text_from_url(web_url)
-        if not content:
-            logger.error("Tidak ada teks yang dapat diekstrak dari website ini")
-            return jsonify({"error": "Tidak ada teks yang dapat diekstrak dari website ini"}), 400
-
-        logger.info(f"Jumlah kata teks: {len(content.split())}")
-
-        # Batasi teks ke 300 kata untuk mempercepat pemrosesan
-        if len(content.split()) > 300:
-            content = " ".join(content.split()[:300])
-            logger.warning("Teks dipotong menjadi 300 kata untuk optimasi")
-
-        if not api_key:
-            logger.error("API Key OpenRouter tidak ditemukan di environment!")
-            return jsonify({"error": "API Key tidak tersedia"}), 500
-
-        prompt = f"""
-        Tolong buatkan ringkasan dalam bentuk poin-poin dan paragraf kesimpulan dari isi website berikut dalam bahasa Indonesia. 
-        Hanya berikan ringkasan dalam format poin-poin dan paragraf kesimpulan, tanpa penjelasan proses pemikiran, langkah-langkah, atau informasi tambahan lainnya:
-        
-        {content}
-        """
-
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://lintasai.com/web-summarizer-ai/",
-            "X-Title": "Web Summarizer"
-        }
-
-        payload = {
-            "model": "deepseek/deepseek-r1:free",
-            "messages": [
-                {"role": "system", "content": "You are a helpful assistant that summarizes website content."},
-                {"role": "user", "content": prompt}
-            ]
-        }
-
-        # Setup retry untuk permintaan OpenRouter
-        session = requests.Session()
-        retries = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
-        session.mount("https://", HTTPAdapter(max_retries=retries))
-
-        # Tambahkan timeout dan logging waktu
-        start_time = time.time()
-        try:
-            response = session.post(
-                "https://openrouter.ai/api/v1/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=60
-            )
-            elapsed_time = time.time() - start_time
-            logger.info(f"OpenRouter respons dalam {elapsed_time:.2f} detik, status: {response.status_code}")
-        except requests.exceptions.Timeout:
-            logger.error("Permintaan ke OpenRouter timeout setelah 60 detik")
-            return jsonify({"error": "Permintaan ke layanan AI timeout. Coba lagi nanti."}), 504
-        except requests.exceptions.ConnectionError as e:
-            logger.error(f"Koneksi ke OpenRouter gagal: {str(e)}")
-            return jsonify({"error": "Gagal menghubungi layanan AI karena masalah koneksi."}), 503
-        except requests.exceptions.SSLError as e:
-            logger.error(f"SSL error saat menghubungi OpenRouter: {str(e)}")
-            return jsonify({"error": "Gagal menghubungi layanan AI karena masalah SSL."}), 503
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Gagal menghubungi OpenRouter: {str(e)}")
-            return jsonify({"error": f"Gagal menghubungi layanan AI: {str(e)}"}), 503
-
-        if response.status_code != 200:
-            logger.error(f"Error dari OpenRouter: {response.status_code} - {response.text}")
-            return jsonify({"error": "Gagal meringkas website", "details": response.text}), 500
+        # Klien dapat meminta ringkasan dikirim bertahap lewat SSE dengan "stream": true
+        stream = bool(data.get("stream"))
 
-        try:
-            result = response.json()
-            logger.info(f"Raw OpenRouter JSON response: {result}")
-            # Coba format standar OpenAI
-            if "choices" in result and result["choices"]:
-                summary = result["choices"][0]["message"]["content"]
-            # Coba format alternatif
-            elif "content" in result:
-                summary = result["content"]
-            # Coba format lain
-            elif "message" in result and "content" in result["message"]:
-                summary = result["message"]["content"]
+        result, status = _summarize_cached(web_url, stream=stream)
+        if stream and status == 200:
+            return Response(result, mimetype="text/event-stream")
+        return jsonify(result), status
+
+    except Exception as e:
+        logger.error(f"Terjadi exception fatal: {str(e)}")
+        return jsonify({"error": f"Terjadi error internal: {str(e)}"}), 500
+
+# Route untuk ringkasan beberapa URL sekaligus
+@app.post('/summarize_batch')
+def summarize_batch():
+    try:
+        logger.info(f"Received {request.method} request to /summarize_batch from {request.origin}")
+        data = request.get_json()
+        logger.info(f"Data diterima: {data}")
+
+        if not data or not isinstance(data.get("web_urls"), list) or not data["web_urls"]:
+            logger.error("web_urls tidak ditemukan dalam request")
+            return jsonify({"error": "Parameter 'web_urls' berupa daftar URL diperlukan"}), 400
+
+        # Buang URL duplikat dengan tetap menjaga urutan
+        web_urls = list(dict.fromkeys(str(url) for url in data["web_urls"]))
+        if len(web_urls) > MAX_BATCH_URLS:
+            logger.error(f"Terlalu banyak URL dalam batch: {len(web_urls)}")
+            return jsonify({"error": f"Maksimal {MAX_BATCH_URLS} URL per permintaan"}), 400
+
+        # Ambil, parsing, dan ringkas setiap URL secara paralel
+        summaries = {}
+        errors = {}
+        for web_url, result in zip(web_urls, _run_batch(web_urls)):
+            if "summary" in result:
+                summaries[web_url] = result["summary"]
             else:
-                raise KeyError("No valid content found in JSON response")
-            logger.info(f"Extracted summary: {summary[:200]}...")
-            return jsonify({"summary": summary})
-        except Exception as e:
-            logger.error(f"Gagal parsing JSON dari OpenRouter: {str(e)}")
-            return jsonify({"error": f"Gagal membaca respons dari OpenRouter: {str(e)}"}), 500
+                errors[web_url] = result.get("error", "Gagal meringkas website")
+
+        response = {"summaries": summaries}
+        if errors:
+            response["errors"] = errors
+        return jsonify(response)
 
     except Exception as e:
         logger.error(f"Terjadi exception fatal: {str(e)}")
         return jsonify({"error": f"Terjadi error internal: {str(e)}"}), 500
 
 if __name__ == '__main__':
+    # Hanya dipasang saat dijalankan langsung; di bawah gunicorn, SIGABRT ditangani oleh gunicorn sendiri
+    signal.signal(signal.SIGABRT, handle_abort_signal)
     app.run(host='0.0.0.0', port=int(os.getenv('PORT', 8000)))
\ No newline at end of file
@@ -0,0 +1,5 @@
+# Monkey-patch harus dijalankan sebelum modul lain (terutama requests) diimpor
+from gevent import monkey
+monkey.patch_all()
+
+from web_api import app  # noqa: E402